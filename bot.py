@@ -1,3 +1,6 @@
+# 起動時間の計測用、import時間も計測するため最初に読み込む
+from cogs.utils.startup_profiler import profiler  # isort: skip
+
 import logging  # log用
 import logging.handlers  # loggingのheader設定用
 import pathlib  # Pathを扱うためのライブラリ
@@ -22,13 +25,23 @@ class MyBot(commands.Bot):
         )
 
     async def setup_hook(self) -> None:
+        profiler.mark("setup_hook_start")
+        # 起動時間の計測時のみ、gatewayから受け取ったイベントを記録する
+        if profiler.enabled:
+            self.add_listener(self._record_gateway_event, "on_socket_event_type")
         # cogsフォルダにある.pyファイルを読み込む(要解説)
         for cog in current_path.glob("cogs/*.py"):
             try:
                 # cogファイルを読み込む
-                await self.load_extension(f"cogs.{cog.stem}")
+                with profiler.measure_cog(cog.stem):
+                    await self.load_extension(f"cogs.{cog.stem}")
             except Exception:
                 traceback.print_exc()
+        profiler.mark("setup_hook_end")
+
+    async def _record_gateway_event(self, event_type: str):
+        # 起動時間の計測用に、gatewayから受け取ったイベントを記録する
+        profiler.record_gateway_event(event_type)
 
     async def on_ready(self):
         # 起動時にターミナルにログイン通知が表示される
@@ -38,6 +51,10 @@ class MyBot(commands.Bot):
             print(self.user.name)
             print(self.user.id)
         print("------")
+        # 起動時間の計測結果をログフォルダに保存
+        profiler.finish(current_path / "log")
+        # 計測が終わったら、以降のイベントで余計な処理をしないようにリスナーを外す
+        self.remove_listener(self._record_gateway_event, "on_socket_event_type")
         # ログファイルに再起動を記録
         logger.warning("rebooted")
         # activity(botの名前の下に出るやつ)を設定
@@ -45,6 +62,8 @@ class MyBot(commands.Bot):
 
 
 if __name__ == "__main__":
+    profiler.mark("imports_done")
+
     # .envファイルを読み込む(要解説)
     dotenv_path = pathlib.Path(__file__).parents[0] / ".env"
     load_dotenv(dotenv_path)
@@ -104,6 +123,8 @@ if __name__ == "__main__":
     # コマンドプレフィックスから始まるメッセージと、botへのメンションをコマンドとして認識する
     bot = MyBot(command_prefix=commands.when_mentioned_or("/"))
 
+    profiler.mark("run_called")
+
     # botを起動
     # token、ログハンドラー、ログフォーマッター、ログレベルを設定
     bot.run(token, log_handler=handler, log_formatter=formatter, log_level=logging.WARNING)
@@ -0,0 +1,285 @@
+import time
+
+# このモジュールが読み込まれた時刻をbot.pyの実行開始時刻とみなすため、他のimportより先に記録する
+_SCRIPT_STARTED_AT = time.perf_counter()
+
+import atexit  # noqa: E402
+import builtins  # noqa: E402
+import contextlib  # noqa: E402
+import os  # noqa: E402
+import pathlib  # noqa: E402
+import sys  # noqa: E402
+import threading  # noqa: E402
+import typing  # noqa: E402
+
+# プロファイルモードを有効にする環境変数
+ENV_NAME = "STARTUP_PROFILE"
+
+# bot.pyのあるディレクトリ
+ROOT_PATH = pathlib.Path(__file__).parents[2]
+
+# bot.py側のimportを正しく計測するため、json、logging、dotenvなどは使う箇所でimportする
+
+
+class StartupProfiler:
+    """プロセス起動からon_readyまでの各フェーズの所要時間を計測するクラス
+
+    環境変数STARTUP_PROFILEが有効な場合のみ計測を行い、無効な場合は何もしない。
+    import時間を計測するため、bot.pyの最初のimportとして読み込むこと。
+    on_readyまでにプロセスが終了した場合は、終了時にそれまでの計測結果を保存する。
+    """
+
+    # フェーズ名と、その開始・終了を表すマーク名
+    PHASES = (
+        ("python_startup", "process_start", "script_start"),
+        ("imports", "script_start", "imports_done"),
+        ("setup", "imports_done", "run_called"),
+        ("login", "run_called", "setup_hook_start"),
+        ("setup_hook", "setup_hook_start", "setup_hook_end"),
+        ("gateway_connect", "setup_hook_end", "gateway_ready"),
+        ("guild_streaming", "gateway_ready", "guild_create_last"),
+        ("member_chunking", "member_chunk_first", "member_chunk_last"),
+        ("until_on_ready", "gateway_ready", "on_ready"),
+        ("total", "process_start", "on_ready"),
+    )
+
+    def __init__(self, enabled: bool, started_at: float = _SCRIPT_STARTED_AT):
+        self.enabled = enabled
+        self.finished = False
+
+        self._started_at = started_at
+        self._started_at_epoch = time.time() - (time.perf_counter() - started_at)
+        self._marks: dict[str, float] = {}
+        self._cogs: dict[str, float] = {}
+        self._imports: dict[str, float] = {}
+        self._cog_imports: dict[str, float] = {}
+        self._gateway_events: dict[str, int] = {}
+
+        self._original_import = builtins.__import__
+        # スレッドごとにimportの入れ子の深さを管理する
+        self._local = threading.local()
+
+        if self.enabled:
+            self._marks["script_start"] = 0.0
+            # フックを設定する前の、このモジュール自身と.envの読み込みにかかった時間
+            self._imports[__name__] = time.perf_counter() - started_at
+            process_start = self._get_process_start_epoch()
+            if process_start is not None:
+                self._marks["process_start"] = process_start - self._started_at_epoch
+            builtins.__import__ = self._timed_import
+            atexit.register(self._finish_at_exit)
+
+    @classmethod
+    def from_env(cls) -> "StartupProfiler":
+        """環境変数の値からプロファイラを作成する関数、.envファイルの値も参照する
+
+        Returns:
+            StartupProfiler: プロファイラ
+        """
+        from dotenv import load_dotenv
+
+        load_dotenv(ROOT_PATH / ".env")
+        value = os.getenv(ENV_NAME, "")
+        return cls(enabled=value.strip().lower() in ("1", "true", "yes", "on"))
+
+    def mark(self, name: str) -> None:
+        """フェーズの区切りを記録する関数、同じ名前は最初の1回のみ記録する
+
+        Args:
+            name (str): マーク名
+        """
+        if self.enabled and not self.finished and name not in self._marks:
+            self._marks[name] = time.perf_counter() - self._started_at
+
+    @contextlib.contextmanager
+    def measure_cog(self, name: str) -> typing.Iterator[None]:
+        """cogの読み込み時間を計測するコンテキストマネージャ
+
+        Args:
+            name (str): cogの名前
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._cogs[name] = time.perf_counter() - start
+
+    def record_gateway_event(self, event_type: str) -> None:
+        """gatewayから受信したイベントを記録する関数
+
+        Args:
+            event_type (str): イベントの種類
+        """
+        if not self.enabled or self.finished:
+            return
+
+        self._gateway_events[event_type] = self._gateway_events.get(event_type, 0) + 1
+
+        if event_type == "READY":
+            self.mark("gateway_ready")
+        elif event_type == "GUILD_CREATE":
+            self.mark("guild_create_first")
+            self._marks["guild_create_last"] = time.perf_counter() - self._started_at
+        elif event_type == "GUILD_MEMBERS_CHUNK":
+            self.mark("member_chunk_first")
+            self._marks["member_chunk_last"] = time.perf_counter() - self._started_at
+
+    def finish(self, log_dir: pathlib.Path = ROOT_PATH / "log", completed: bool = True) -> pathlib.Path | None:
+        """計測を終了し、レポートをJSONで保存してサマリーを表示する関数
+
+        Args:
+            log_dir (pathlib.Path, optional): レポートの保存先ディレクトリ. Defaults to ROOT_PATH / "log".
+            completed (bool, optional): on_readyまで到達したかどうか. Defaults to True.
+
+        Returns:
+            pathlib.Path | None: 保存したレポートのパス、計測していない場合や保存に失敗した場合はNone
+        """
+        if not self.enabled or self.finished:
+            return None
+
+        if completed:
+            self.mark("on_ready")
+        self.finished = True
+        if builtins.__import__ == self._timed_import:
+            builtins.__import__ = self._original_import
+
+        # フックを外した後にimportし、レポート作成のためのimportを計測に含めない
+        import json
+        import logging
+        from datetime import datetime
+
+        report = self._build_report(completed)
+
+        report_path = log_dir / f"startup_profile_{datetime.now():%Y%m%d_%H%M%S}.json"
+        try:
+            log_dir.mkdir(parents=True, exist_ok=True)
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            # 計測のせいでbotの起動を止めないように、保存に失敗してもログに残すだけにする
+            logging.getLogger("discord").error(f"起動時間のレポートの保存に失敗しました: {e}")
+            report_path = None
+
+        self._print_summary(report, report_path)
+        return report_path
+
+    def _finish_at_exit(self) -> None:
+        """on_readyまでにプロセスが終了した場合に、途中までの計測結果を保存する関数"""
+        self.finish(completed=False)
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """builtins.__import__の代わりに使う関数、新規に読み込まれたモジュールのimport時間を記録する"""
+        if level != 0 or getattr(self._local, "depth", 0) > 0 or not self._is_new_import(name, fromlist):
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._local.depth = 1
+        modules_before = len(sys.modules)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._local.depth = 0
+            # from os import getenvのように属性のみをimportした場合は記録しない
+            if len(sys.modules) > modules_before:
+                # imports_done以降(cogの読み込み時など)のimportは別に集計する
+                imports = self._cog_imports if "imports_done" in self._marks else self._imports
+                imports[name] = imports.get(name, 0.0) + elapsed
+
+    @staticmethod
+    def _is_new_import(name: str, fromlist) -> bool:
+        """まだ読み込まれていないモジュールを含むimportかどうかを返す関数"""
+        if name not in sys.modules:
+            return True
+        # from pkg import submoduleの場合、pkgが読み込み済みでもsubmoduleは新規の場合がある
+        return any(f"{name}.{item}" not in sys.modules for item in fromlist or () if item != "*")
+
+    def _build_report(self, completed: bool) -> dict:
+        """レポートの内容を作成する関数"""
+        import platform
+        from datetime import datetime
+
+        phases = {}
+        for phase, start, end in self.PHASES:
+            if start in self._marks and end in self._marks:
+                phases[phase] = self._to_ms(self._marks[end] - self._marks[start])
+
+        return {
+            "completed": completed,
+            "started_at": datetime.fromtimestamp(self._started_at_epoch).isoformat(),
+            "python": platform.python_version(),
+            "discord.py": getattr(sys.modules.get("discord"), "__version__", None),
+            "marks_ms": {name: self._to_ms(value) for name, value in sorted(self._marks.items(), key=lambda m: m[1])},
+            "phases_ms": phases,
+            "cogs_ms": {name: self._to_ms(value) for name, value in self._cogs.items()},
+            "imports_ms": self._sorted_ms(self._imports),
+            "cog_imports_ms": self._sorted_ms(self._cog_imports),
+            "gateway_events": self._gateway_events,
+            "peak_rss_kb": self._get_peak_rss_kb(),
+        }
+
+    @staticmethod
+    def _print_summary(report: dict, report_path: pathlib.Path | None) -> None:
+        """レポートのサマリーをターミナルに表示する関数"""
+        rows = list(report["phases_ms"].items())
+        rows += [(f"import {name}", value) for name, value in list(report["imports_ms"].items())[:5]]
+        # 列を揃えるため、項目名の幅を最も長い項目名に合わせる
+        width = max([24] + [len(label) for label, _ in rows])
+
+        print("----- startup profile -----")
+        if not report["completed"]:
+            print("on_ready was not reached")
+        for label, value in rows:
+            print(f"{label:<{width}} {value:>10.1f} ms")
+        if report["peak_rss_kb"] is not None:
+            print(f"{'peak rss':<{width}} {report['peak_rss_kb'] / 1024:>10.1f} MiB")
+        print(f"report: {report_path}")
+        print("---------------------------")
+
+    @staticmethod
+    def _to_ms(seconds: float) -> float:
+        return round(seconds * 1000, 3)
+
+    @classmethod
+    def _sorted_ms(cls, durations: dict[str, float]) -> dict[str, float]:
+        """所要時間の長い順に並べ、ミリ秒に変換した辞書を返す関数"""
+        items = sorted(durations.items(), key=lambda item: item[1], reverse=True)
+        return {name: cls._to_ms(value) for name, value in items}
+
+    @staticmethod
+    def _get_peak_rss_kb() -> int | None:
+        """プロセスの最大常駐メモリ(KB)を返す関数、取得できない場合はNone"""
+        try:
+            import resource  # Windowsには存在しない
+        except ImportError:
+            return None
+
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOSではbytes、Linuxではkilobytesで返る
+        if sys.platform == "darwin":
+            return max_rss // 1024
+        return max_rss
+
+    @staticmethod
+    def _get_process_start_epoch() -> float | None:
+        """/procからプロセスの起動時刻(UNIX時間)を返す関数、取得できない場合はNone"""
+        try:
+            stat = pathlib.Path(f"/proc/{os.getpid()}/stat").read_text()
+            # プロセス名に空白や括弧が含まれる場合があるため、最後の")"以降を分割する
+            start_ticks = int(stat.rpartition(")")[2].split()[19])
+
+            # btimeは秒単位で精度が足りないため、/proc/uptimeからプロセスの経過時間を求める
+            uptime = float(pathlib.Path("/proc/uptime").read_text().split()[0])
+            age = uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+
+            return time.time() - age
+        except (OSError, ValueError, IndexError):
+            return None
+
+
+# bot.pyから読み込まれた時点で計測を開始する
+profiler = StartupProfiler.from_env()